@@ -0,0 +1,58 @@
+"""
+Change-detection cache for slow-moving host facts.
+
+A CachedValue keeps the result of an expensive call and only recomputes it
+when its trigger reports a different token, e.g. the mtime of the file the
+value is read from. Without a trigger the value is computed once.
+"""
+
+import os
+import time
+from typing import Any, Callable, Optional
+
+
+class CachedValue:
+    """
+    Caches compute(*args) until trigger(*args) returns a token different
+    from the one seen at the last computation.
+    """
+
+    def __init__(self, compute: Callable[..., Any], trigger: Optional[Callable[..., Any]] = None):
+        self.compute = compute
+        self.trigger = trigger
+        self._valid = False
+        self._token: Any = None
+        self._value: Any = None
+
+    def get(self, *args) -> Any:
+        token = self.trigger(*args) if self.trigger is not None else None
+        if not self._valid or token != self._token:
+            self._value = self.compute(*args)
+            self._token = token
+            self._valid = True
+        return self._value
+
+    def invalidate(self):
+        self._valid = False
+
+
+def path_mtime(path: str) -> Callable[..., Any]:
+    """
+    Trigger that changes with the mtime of `path` (a file or a directory).
+    If the path cannot be stat'ed the value is recomputed on every call.
+    """
+    def trigger(*args) -> Any:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return object()
+
+    return trigger
+
+
+def every(seconds: float) -> Callable[..., Any]:
+    """Trigger that changes once every `seconds`, for values that have no cheap change signal."""
+    def trigger(*args) -> Any:
+        return int(time.monotonic() // seconds)
+
+    return trigger
@@ -0,0 +1,344 @@
+"""
+cgroup v2 per-group resource collection (Linux only).
+
+Units:
+- usage_usec, user_usec, system_usec, throttled_usec: microseconds (cumulative)
+- nr_periods, nr_throttled: count (cumulative)
+- memory_current, memory_stat values: bytes (pgfault, pgmajfault: count)
+- io rbytes, wbytes: bytes (cumulative)
+- io rios, wios: count (cumulative)
+- pressure avg10, avg60, avg300: percentage (%)
+- pressure total: microseconds (cumulative)
+
+Discovered cgroup directories are cached together with their mtime and the
+nr_descendants/nr_dying_descendants counters from their cgroup.stat. kernfs
+does not touch a parent's mtime when a child cgroup is created, so the
+counters decide which subtrees are re-listed: a directory whose counters and
+mtime are unchanged has the same descendants as before and is skipped along
+with everything below it. Every RESCAN_INTERVAL seconds the whole tree is
+re-listed anyway, which catches a create and remove that cancel out between
+two ticks and counter files that appear when a controller is enabled. Hot
+counter files are kept open and re-read with pread() instead of being
+reopened every tick.
+"""
+
+import os
+import platform
+from typing import TypedDict, Dict, List, Optional, Set, Tuple
+import time
+
+OS_TYPE = platform.system()
+
+
+def _find_root() -> str:
+    # Hybrid hosts mount the v2 hierarchy under 'unified'.
+    for root in ('/sys/fs/cgroup', '/sys/fs/cgroup/unified'):
+        if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+            return root
+    return '/sys/fs/cgroup'
+
+
+CGROUP_ROOT = _find_root()
+
+MEMORY_STAT_KEYS = (
+    'anon', 'file', 'kernel_stack', 'slab', 'sock', 'shmem',
+    'file_dirty', 'file_writeback', 'pgfault', 'pgmajfault',
+)
+
+# Keep at most half of the soft fd limit for cached counter handles; files
+# beyond that are opened and closed on every read.
+MAX_OPEN_HANDLES = 0
+if OS_TYPE == 'Linux':
+    import resource
+    _soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    MAX_OPEN_HANDLES = 32768 if _soft_limit == resource.RLIM_INFINITY else _soft_limit // 2
+
+RESCAN_INTERVAL = 300.0  # seconds between full re-listings of the tree
+
+_READ_SIZE = 65536
+_MISSING = -1  # cached marker for counter files the cgroup does not have
+
+# path -> (mtime, (nr_descendants, nr_dying_descendants) or None, child paths)
+_dirs: Dict[str, Tuple[float, Optional[Tuple[int, int]], Set[str]]] = {}
+_handles: Dict[str, Dict[str, int]] = {}
+_open_handles = 0
+_last_full_scan = 0.0
+
+
+class CgroupStatic(TypedDict):
+    root: str
+    controllers: List[str]
+    cgroup_count: int
+
+
+class CPUStat(TypedDict):
+    usage_usec: int
+    user_usec: int
+    system_usec: int
+    nr_periods: int
+    nr_throttled: int
+    throttled_usec: int
+
+
+class IOTotal(TypedDict):
+    rbytes: int
+    wbytes: int
+    rios: int
+    wios: int
+
+
+class PressureLine(TypedDict):
+    avg10: float
+    avg60: float
+    avg300: float
+    total: int
+
+
+class CgroupMetrics(TypedDict):
+    cpu: Optional[CPUStat]
+    memory_current: int
+    memory_stat: Optional[Dict[str, int]]
+    io: Optional[IOTotal]
+    pressure: Dict[str, Optional[Dict[str, PressureLine]]]
+
+
+class CgroupDynamic(TypedDict):
+    cgroups: Dict[str, CgroupMetrics]
+
+
+def _relative(path: str) -> str:
+    rel = os.path.relpath(path, CGROUP_ROOT)
+    return '/' if rel == '.' else '/' + rel
+
+
+def _drop_tree(path: str):
+    """Removes `path` and its descendants from the cache and closes their handles."""
+    prefix = path + os.sep
+    for cached in [p for p in _dirs if p == path or p.startswith(prefix)]:
+        del _dirs[cached]
+        _close_handles(cached)
+
+
+def _close_handles(path: str):
+    global _open_handles
+    for fd in _handles.pop(path, {}).values():
+        if fd != _MISSING:
+            os.close(fd)
+            _open_handles -= 1
+
+
+def _forget_missing(path: str):
+    """Lets files cached as missing be looked up again, e.g. after a controller was enabled."""
+    handles = _handles.get(path, {})
+    for name in [name for name, fd in handles.items() if fd == _MISSING]:
+        del handles[name]
+
+
+def _descendant_counts(path: str) -> Optional[Tuple[int, int]]:
+    content = _read(path, 'cgroup.stat')
+    if content is None:
+        return None
+    stat = _parse_flat_keyed(content)
+    return stat.get('nr_descendants', -1), stat.get('nr_dying_descendants', -1)
+
+
+def _refresh_tree():
+    """Re-lists the directories whose descendant counters or mtime changed since the last scan."""
+    global _last_full_scan
+    now = time.monotonic()
+    full = not _dirs or now - _last_full_scan >= RESCAN_INTERVAL
+    if full:
+        _last_full_scan = now
+
+    stack = [CGROUP_ROOT]
+    while stack:
+        path = stack.pop()
+        previous = _dirs.get(path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            _drop_tree(path)
+            continue
+
+        if previous is not None and previous[0] != mtime:
+            # Controller files come and go with the directory mtime.
+            _close_handles(path)
+        elif full:
+            _forget_missing(path)
+        counts = _descendant_counts(path)
+
+        if not full and previous is not None and previous[:2] == (mtime, counts):
+            _dirs[path] = previous
+            if counts is None:
+                # Without cgroup.stat nothing vouches for the subtree; check each child.
+                stack.extend(previous[2])
+            continue
+
+        try:
+            with os.scandir(path) as entries:
+                children = {e.path for e in entries if e.is_dir(follow_symlinks=False)}
+        except (FileNotFoundError, NotADirectoryError):
+            _drop_tree(path)
+            continue
+
+        for gone in (previous[2] if previous else set()) - children:
+            _drop_tree(gone)
+        _dirs[path] = (mtime, counts, children)
+        stack.extend(children)
+
+
+def _read(path: str, name: str) -> Optional[str]:
+    """Reads a counter file, reusing a cached descriptor when possible."""
+    global _open_handles
+    handles = _handles.setdefault(path, {})
+    fd = handles.get(name)
+
+    if fd == _MISSING:
+        return None
+
+    if fd is None:
+        try:
+            fd = os.open(os.path.join(path, name), os.O_RDONLY)
+        except (FileNotFoundError, PermissionError):
+            handles[name] = _MISSING
+            return None
+        if _open_handles < MAX_OPEN_HANDLES:
+            handles[name] = fd
+            _open_handles += 1
+        else:
+            try:
+                return os.read(fd, _READ_SIZE).decode()
+            except OSError:
+                return None
+            finally:
+                os.close(fd)
+
+    try:
+        return os.pread(fd, _READ_SIZE, 0).decode()
+    except OSError:
+        # The cgroup was removed under us; the next refresh drops it.
+        return None
+
+
+def _parse_flat_keyed(content: str) -> Dict[str, int]:
+    values = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(' ')
+        if value:
+            values[key] = int(value)
+    return values
+
+
+def _parse_cpu_stat(content: Optional[str]) -> Optional[CPUStat]:
+    if content is None:
+        return None
+    stat = _parse_flat_keyed(content)
+    return {
+        'usage_usec': stat.get('usage_usec', -1),
+        'user_usec': stat.get('user_usec', -1),
+        'system_usec': stat.get('system_usec', -1),
+        'nr_periods': stat.get('nr_periods', -1),
+        'nr_throttled': stat.get('nr_throttled', -1),
+        'throttled_usec': stat.get('throttled_usec', -1)
+    }
+
+
+def _parse_memory_stat(content: Optional[str]) -> Optional[Dict[str, int]]:
+    if content is None:
+        return None
+    stat = _parse_flat_keyed(content)
+    return {key: stat.get(key, -1) for key in MEMORY_STAT_KEYS}
+
+
+def _parse_io_stat(content: Optional[str]) -> Optional[IOTotal]:
+    if content is None:
+        return None
+    total = {'rbytes': 0, 'wbytes': 0, 'rios': 0, 'wios': 0}
+    for line in content.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition('=')
+            if key in total:
+                total[key] += int(value)
+    return total
+
+
+def _parse_pressure(content: Optional[str]) -> Optional[Dict[str, PressureLine]]:
+    if content is None:
+        return None
+    pressure = {}
+    for line in content.splitlines():
+        kind, *fields = line.split()
+        values = dict(field.split('=') for field in fields)
+        pressure[kind] = {
+            'avg10': float(values['avg10']),
+            'avg60': float(values['avg60']),
+            'avg300': float(values['avg300']),
+            'total': int(values['total'])
+        }
+    return pressure
+
+
+def get_cgroup_static_metadata() -> CgroupStatic:
+    controllers = []
+    if OS_TYPE == 'Linux':
+        try:
+            with open(os.path.join(CGROUP_ROOT, 'cgroup.controllers')) as f:
+                controllers = f.read().split()
+        except FileNotFoundError:
+            pass
+        _refresh_tree()
+
+    return {
+        'root': CGROUP_ROOT,
+        'controllers': controllers,
+        'cgroup_count': len(_dirs)
+    }
+
+
+def get_cgroup_dynamic_metrics() -> CgroupDynamic:
+    cgroups = {}
+
+    match OS_TYPE:
+        case 'Linux':
+            _refresh_tree()
+            for path in list(_dirs):
+                memory_current = _read(path, 'memory.current')
+                cgroups[_relative(path)] = {
+                    'cpu': _parse_cpu_stat(_read(path, 'cpu.stat')),
+                    'memory_current': int(memory_current) if memory_current else -1,
+                    'memory_stat': _parse_memory_stat(_read(path, 'memory.stat')),
+                    'io': _parse_io_stat(_read(path, 'io.stat')),
+                    'pressure': {
+                        'cpu': _parse_pressure(_read(path, 'cpu.pressure')),
+                        'memory': _parse_pressure(_read(path, 'memory.pressure')),
+                        'io': _parse_pressure(_read(path, 'io.pressure'))
+                    }
+                }
+        case 'Darwin' | 'Windows':
+            pass
+
+    return {
+        'cgroups': cgroups
+    }
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+
+    print("=== cgroup Static Metadata ===")
+    static = get_cgroup_static_metadata()
+    for key, value in static.items():
+        print(f"{key}: {value}")
+
+    print("\n=== cgroup Dynamic Metrics ===")
+    dynamic = get_cgroup_dynamic_metrics()
+    for name, values in dynamic['cgroups'].items():
+        print(f"{name}: {values}")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\nTime taken: {elapsed:.4f} seconds")
+
+    start_time = time.perf_counter()
+    get_cgroup_dynamic_metrics()
+    elapsed = time.perf_counter() - start_time
+    print(f"Time taken (cached handles): {elapsed:.4f} seconds")
@@ -10,13 +10,22 @@ Units:
 - usage_percent: percentage (%)
 """
 
+import glob
+import os
 import psutil
 import platform
-from typing import TypedDict
+from typing import TypedDict, Optional
 import time
 
+from core.cache import CachedValue, every
+
 OS_TYPE = platform.system()
 
+CPU_SENSOR_NAMES = ('coretemp', 'cpu_thermal', 'k10temp', 'zenpower')
+
+# How often the temperature file is looked up again, e.g. after a driver was loaded.
+TEMP_REDISCOVER_INTERVAL = 600
+
 class CPUStatic(TypedDict):
     logical_cores: int
     physical_cores: int
@@ -48,6 +57,59 @@ def get_cpu_static_metadata() -> CPUStatic:
     }
 
 
+def _find_cpu_temp_input() -> Optional[str]:
+    """
+    Finds the file psutil.sensors_temperatures() would report first for the
+    preferred CPU sensor, so later ticks read one file instead of scanning
+    every hwmon device.
+
+    Like psutil, hwmon temp*_input files are ordered by the path up to the
+    first '_' (so temp1 precedes temp10 and temp2), and thermal zones are
+    only used when there are no hwmon temperature files at all.
+    """
+    inputs = glob.glob('/sys/class/hwmon/hwmon*/temp*_input')
+    inputs.extend(glob.glob('/sys/class/hwmon/hwmon*/device/temp*_input'))
+
+    by_name = {}
+    for path in sorted(inputs, key=lambda path: path.split('_')[0]):
+        try:
+            with open(os.path.join(os.path.dirname(path), 'name')) as f:
+                name = f.read().strip()
+        except OSError:
+            continue
+        by_name.setdefault(name, path)
+
+    if not inputs:
+        for zone in sorted(glob.glob('/sys/class/thermal/thermal_zone*')):
+            try:
+                with open(os.path.join(zone, 'type')) as f:
+                    name = f.read().strip()
+            except OSError:
+                continue
+            by_name.setdefault(name, os.path.join(zone, 'temp'))
+
+    for name in CPU_SENSOR_NAMES:
+        if name in by_name:
+            return by_name[name]
+    return None
+
+
+# A missing sensor is cached too; discovery only runs again on a slow timer,
+# so every tick costs at most one file read.
+_cpu_temp_input = CachedValue(_find_cpu_temp_input, trigger=every(TEMP_REDISCOVER_INTERVAL))
+
+
+def _get_cpu_temperature() -> float | int:
+    path = _cpu_temp_input.get()
+    if path is None:
+        return -1
+    try:
+        with open(path) as f:
+            return int(f.read()) / 1000.0
+    except (OSError, ValueError):
+        return -1
+
+
 def get_cpu_dynamic_metrics() -> CPUDynamic:
     times = psutil.cpu_times()
     stats = psutil.cpu_stats()
@@ -59,9 +121,7 @@ def get_cpu_dynamic_metrics() -> CPUDynamic:
 
     match OS_TYPE:
         case 'Linux':
-            temps = psutil.sensors_temperatures()
-            sensor_list = temps.get('coretemp', temps.get('cpu_thermal', temps.get('k10temp', temps.get('zenpower', []))))
-            temperature = sensor_list[0].current if sensor_list else -1
+            temperature = _get_cpu_temperature()
             load_average = psutil.getloadavg()
             iowait = times.iowait
         case 'Darwin':
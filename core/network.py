@@ -5,11 +5,23 @@ Provides raw, non-converted values.
 '''
 import psutil
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+from core.cache import CachedValue
 
 _previous_io_counters = psutil.net_io_counters(pernic=True)
 _previous_time = time.time()
 
+def _read_ethernet_flags(names: Tuple[str, ...]) -> Dict[str, bool]:
+    if_addrs = psutil.net_if_addrs()
+    return {name: any(addr.family == psutil.AF_LINK for addr in if_addrs.get(name, [])) for name in names}
+
+
+# Link-layer addresses only change when interfaces come or go, so
+# net_if_addrs() is re-read only when the set of interface names changes.
+_ethernet_flags = CachedValue(_read_ethernet_flags, trigger=lambda names: names)
+
+
 def get_network_info() -> Dict[str, Any]:
     """
     Gathers raw network information using psutil.
@@ -23,7 +35,7 @@ def get_network_info() -> Dict[str, Any]:
     time_delta = current_time - _previous_time
 
     if_stats = psutil.net_if_stats()
-    if_addrs = psutil.net_if_addrs()
+    ethernet_flags = _ethernet_flags.get(tuple(sorted(if_stats)))
 
     interfaces_data = {}
     summary_counts = {
@@ -43,7 +55,7 @@ def get_network_info() -> Dict[str, Any]:
         else:
             summary_counts['down'] += 1
         
-        is_ethernet = any(addr.family == psutil.AF_LINK for addr in if_addrs.get(name, []))
+        is_ethernet = ethernet_flags[name]
 
         current_io = current_io_counters[name]
         prev_io = _previous_io_counters.get(name, current_io)
@@ -14,8 +14,15 @@ from datetime import datetime
 from typing import TypedDict, List
 import time
 
+from core.cache import CachedValue, path_mtime
+
 OS_TYPE = platform.system()
 
+UTMP_PATHS = {
+    'Linux': '/var/run/utmp',
+    'Darwin': '/var/run/utmpx',
+}
+
 
 class OSInfo(TypedDict):
     system: str
@@ -66,7 +73,7 @@ def get_system_static_metadata() -> SystemStatic:
     }
 
 
-def get_system_dynamic_metrics() -> SystemDynamic:
+def _read_users() -> List[UserInfo]:
     users = []
     for user in psutil.users():
         users.append({
@@ -75,11 +82,20 @@ def get_system_dynamic_metrics() -> SystemDynamic:
             'host': user.host,
             'started': user.started
         })
+    return users
+
 
+# Boot time never changes while we run; the user list only changes when the
+# utmp file is rewritten (there is no such file on Windows, so it is re-read).
+_boot_time = CachedValue(psutil.boot_time)
+_users = CachedValue(_read_users, trigger=path_mtime(UTMP_PATHS.get(OS_TYPE, '')))
+
+
+def get_system_dynamic_metrics() -> SystemDynamic:
     return {
         'timestamp': datetime.now().isoformat(),
-        'uptime': time.time() - psutil.boot_time(),
-        'users': users
+        'uptime': time.time() - _boot_time.get(),
+        'users': _users.get()
     }
 
 
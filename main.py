@@ -1,11 +1,60 @@
-from src.config_loader import load_config, get_server_config, get_collector_config, get_client_config
+import argparse
+import signal
+
+from src.config_loader import (load_config, get_server_config, get_collector_config, get_client_config,
+                               get_relay_config, get_archive_config, get_profile_config)
 from src.collector import MetricsCollector
-from src.transmitter import HTTPTransmitter
+from src.transmitter import create_transmitter
 from src.monitor_service import MonitorService
+from src import profiler
+from src.archive import ArchiveWriter
+from src.relay import RelayService
+from src.split_mode import SplitSupervisor
+
+
+def run_relay(config):
+    server_cfg = get_server_config(config)
+    relay_cfg = get_relay_config(config)
+    connections = relay_cfg.get('connections', 2)
+
+    transmitter = create_transmitter(server_cfg, pool_size=connections)
+
+    relay = RelayService(
+        transmitter=transmitter,
+        host=relay_cfg.get('host', '0.0.0.0'),
+        port=relay_cfg.get('port', 8080),
+        endpoint=relay_cfg.get('endpoint', server_cfg.get('endpoint')),
+        max_batch=relay_cfg.get('max_batch', 500),
+        flush_interval=relay_cfg.get('flush_interval', 2.0),
+        max_buffer=relay_cfg.get('max_buffer', 100000),
+        connections=connections
+    )
+
+    relay.start()
 
 
 def main():
-    config = load_config('config.yaml')
+    parser = argparse.ArgumentParser(description='System monitor agent')
+    parser.add_argument('--config', default='config.yaml', help='path to config.yaml')
+    parser.add_argument('--relay', action='store_true', help='run as a relay for other agents instead of collecting')
+    parser.add_argument('--split', action='store_true', help='collect and ship in separate supervised processes')
+    parser.add_argument('--archive', action='store_true', help='write metrics to the local archive instead of sending them')
+    parser.add_argument('--profile', action='store_true', help='profile the first collection cycles (SIGUSR1 profiles later ones)')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+
+    if args.relay:
+        run_relay(config)
+        return
+
+    if args.split:
+        if not get_client_config(config).get('id'):
+            raise ValueError("client id not found in config.yaml under client section")
+        # The shipper process builds its own transmitter; check the server section before forking.
+        create_transmitter(get_server_config(config)).close()
+        SplitSupervisor(config).start()
+        return
 
     server_cfg = get_server_config(config)
     collector_cfg = get_collector_config(config)
@@ -17,21 +66,40 @@ def main():
 
     collector = MetricsCollector(
         enabled_modules=collector_cfg.get('modules'),
-        client_id=client_id
+        client_id=client_id,
+        budget=collector_cfg.get('budget')
     )
 
-    transmitter = HTTPTransmitter(
-        server_url=server_cfg.get('url'),
-        endpoint=server_cfg.get('endpoint'),
-        timeout=server_cfg.get('timeout'),
-        max_retries=server_cfg.get('max_retries')
+    if args.archive:
+        archive_cfg = get_archive_config(config)
+        transmitter = ArchiveWriter(
+            path=archive_cfg.get('path', 'archive'),
+            segment_seconds=archive_cfg.get('segment_seconds', 3600),
+            max_segments=archive_cfg.get('max_segments', 168),
+            compression_level=archive_cfg.get('compression_level', 6)
+        )
+    else:
+        transmitter = create_transmitter(server_cfg)
+
+    profile_cfg = get_profile_config(config)
+    cycle_profiler = profiler.CycleProfiler(
+        cycles=profile_cfg.get('cycles', 10),
+        output_dir=profile_cfg.get('output_dir', 'profiles'),
+        sample_interval=profile_cfg.get('sample_interval', 0.005)
     )
+    profiler.install(cycle_profiler)
+    if args.profile:
+        cycle_profiler.arm()
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: cycle_profiler.arm())
 
     service = MonitorService(
         collector=collector,
         transmitter=transmitter,
         interval=collector_cfg.get('interval'),
-        batch_size=collector_cfg.get('batch_size')
+        batch_size=collector_cfg.get('batch_size'),
+        max_batch_bytes=collector_cfg.get('max_batch_bytes'),
+        max_batch_age=collector_cfg.get('max_batch_age')
     )
 
     service.start()
@@ -0,0 +1,293 @@
+"""
+Local on-disk archive of collected payloads, for sites without connectivity.
+
+Layout: one pair of files per time segment in the archive directory.
+
+- <start_ms>.seg: records of [u32 length][zlib-compressed JSON payload]
+- <start_ms>.idx: entries of [f64 timestamp][u64 offset into .seg]
+
+Each record is compressed on its own so a time-range read can seek straight
+to the first matching offset found by bisecting the index. Segments rotate
+after `segment_seconds`, and also whenever the clock steps back so that every
+index stays sorted; segments can therefore overlap in time. The least
+recently written segments are removed beyond `max_segments`.
+
+Usage:
+    python -m src.archive query --from 2026-10-01T00:00 --to 2026-10-02T00:00
+    python -m src.archive replay --from 2026-10-01T00:00 --rate 500
+"""
+
+import bisect
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from src.transmitter import Transmitter
+
+_RECORD_LENGTH = struct.Struct('<I')
+_INDEX_ENTRY = struct.Struct('<dQ')
+
+
+def _collected_at(metrics: Dict[str, Any] | bytes) -> float:
+    """Collection time of a payload: its system timestamp, or now if the system module is off."""
+    if isinstance(metrics, bytes):
+        metrics = json.loads(metrics)
+    system = metrics.get('system') or {}
+    try:
+        return datetime.fromisoformat(system['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+class ArchiveWriter(Transmitter):
+    """Transmitter-compatible sink that appends payloads to the archive."""
+
+    def __init__(self, path: str, segment_seconds: float = 3600, max_segments: int = 168,
+                 compression_level: int = 6):
+        self.path = path
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.compression_level = compression_level
+
+        self.segment_start: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+        self.data_file = None
+        self.index_file = None
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def target(self) -> str:
+        return f"archive:{self.path}"
+
+    def write(self, metrics: Dict[str, Any], timestamp: Optional[float] = None,
+              encoded: Optional[bytes] = None):
+        timestamp = _collected_at(metrics) if timestamp is None else timestamp
+        if (self.segment_start is None or timestamp - self.segment_start >= self.segment_seconds
+                or timestamp < self.last_timestamp):
+            self._rotate(timestamp)
+
+        if encoded is None:
+            encoded = json.dumps(metrics).encode()
+        record = zlib.compress(encoded, self.compression_level)
+        offset = self.data_file.tell()
+        self.data_file.write(_RECORD_LENGTH.pack(len(record)))
+        self.data_file.write(record)
+        self.index_file.write(_INDEX_ENTRY.pack(timestamp, offset))
+        self.last_timestamp = timestamp
+
+    def send(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> bool:
+        if isinstance(data, bytes):
+            data = json.loads(data)
+        return self.send_batch(data if isinstance(data, list) else [data])
+
+    def send_batch(self, metrics: List[Dict[str, Any]], encoded: Optional[List[bytes]] = None) -> bool:
+        if not metrics:
+            return True
+        try:
+            for i, metric in enumerate(metrics):
+                self.write(metric, encoded=encoded[i] if encoded is not None else None)
+            # The data has to be on disk before the index points at it.
+            self.data_file.flush()
+            self.index_file.flush()
+        except OSError as e:
+            print(f"[Error] Failed to archive {len(metrics)} metrics: {e}")
+            return False
+        return True
+
+    def close(self):
+        if self.data_file is not None:
+            self.data_file.close()
+            self.index_file.close()
+            self.data_file = None
+            self.index_file = None
+
+    def _rotate(self, timestamp: float):
+        self.close()
+        self.segment_start = timestamp
+        # After a clock step back the name may already be taken; appending
+        # there would unsort its index, so pick a free name just below.
+        start_ms = int(timestamp * 1000)
+        while os.path.exists(os.path.join(self.path, f"{start_ms}.seg")):
+            start_ms -= 1
+        base = os.path.join(self.path, str(start_ms))
+        self.data_file = open(base + '.seg', 'ab')
+        self.index_file = open(base + '.idx', 'ab')
+
+        # Names no longer order segments by age once the clock stepped back.
+        segments = sorted(list_segments(self.path),
+                          key=lambda segment: os.path.getmtime(segment[1] + '.seg'))
+        for _, old_base in segments[:max(0, len(segments) - self.max_segments)]:
+            for suffix in ('.seg', '.idx'):
+                try:
+                    os.remove(old_base + suffix)
+                except FileNotFoundError:
+                    pass
+            print(f"Removed archive segment {old_base}")
+
+
+def list_segments(path: str) -> List[Tuple[float, str]]:
+    """Returns (start timestamp, path without suffix) for every segment, oldest first."""
+    segments = []
+    for name in os.listdir(path):
+        stem, suffix = os.path.splitext(name)
+        if suffix == '.seg' and stem.isdigit():
+            segments.append((int(stem) / 1000, os.path.join(path, stem)))
+    return sorted(segments)
+
+
+def _last_timestamp(base: str) -> float:
+    """Timestamp of the last complete index entry, or -inf for an empty or missing index."""
+    try:
+        with open(base + '.idx', 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            usable = size - size % _INDEX_ENTRY.size
+            if not usable:
+                return float('-inf')
+            f.seek(usable - _INDEX_ENTRY.size)
+            return _INDEX_ENTRY.unpack(f.read(_INDEX_ENTRY.size))[0]
+    except FileNotFoundError:
+        return float('-inf')
+
+
+def _load_index(base: str, data_size: int) -> Tuple[List[float], List[int]]:
+    timestamps, offsets = [], []
+    with open(base + '.idx', 'rb') as f:
+        content = f.read()
+    # Ignore a torn trailing entry and entries pointing past the data written.
+    usable = len(content) - len(content) % _INDEX_ENTRY.size
+    for timestamp, offset in _INDEX_ENTRY.iter_unpack(content[:usable]):
+        if offset >= data_size:
+            break
+        timestamps.append(timestamp)
+        offsets.append(offset)
+    return timestamps, offsets
+
+
+class ArchiveReader:
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read_range(self, start: float, end: float) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """
+        Yields (timestamp, payload) for every record with start <= timestamp <= end,
+        segment by segment in start order. Records are in time order unless the
+        clock stepped back, in which case the overlapping segments interleave.
+        """
+        for segment_start, base in list_segments(self.path):
+            if segment_start > end or _last_timestamp(base) < start:
+                continue
+            yield from self._read_segment(base, start, end)
+
+    def _read_segment(self, base: str, start: float, end: float) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        try:
+            data_size = os.path.getsize(base + '.seg')
+            timestamps, offsets = _load_index(base, data_size)
+        except FileNotFoundError:
+            return
+
+        first = bisect.bisect_left(timestamps, start)
+        if first == len(timestamps):
+            return
+
+        with open(base + '.seg', 'rb') as f:
+            f.seek(offsets[first])
+            for timestamp in timestamps[first:]:
+                if timestamp > end:
+                    return
+                header = f.read(_RECORD_LENGTH.size)
+                if len(header) < _RECORD_LENGTH.size:
+                    return
+                record = f.read(_RECORD_LENGTH.unpack(header)[0])
+                try:
+                    yield timestamp, json.loads(zlib.decompress(record))
+                except zlib.error:
+                    print(f"[Warning] Corrupt record at {timestamp} in {base}.seg, stopping segment")
+                    return
+
+
+def replay(reader: ArchiveReader, transmitter, start: float, end: float,
+           rate: float = 500, batch_size: int = 100) -> Optional[float]:
+    """
+    Sends archived payloads in [start, end] through `transmitter.send_batch`
+    at up to `rate` metrics per second. Returns None when everything was
+    sent, otherwise the timestamp of the first record of the failed batch so
+    the replay can be resumed from there.
+    """
+    sent = 0
+    began = time.monotonic()
+    batch: List[Dict[str, Any]] = []
+    batch_start = start
+
+    for timestamp, metrics in reader.read_range(start, end):
+        if not batch:
+            batch_start = timestamp
+        batch.append(metrics)
+        if len(batch) < batch_size:
+            continue
+
+        if not transmitter.send_batch(batch):
+            return batch_start
+        sent += len(batch)
+        batch = []
+
+        ahead = sent / rate - (time.monotonic() - began)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    if batch and not transmitter.send_batch(batch):
+        return batch_start
+    sent += len(batch)
+
+    elapsed = time.monotonic() - began
+    print(f"Replayed {sent} metrics in {elapsed:.1f}s")
+    return None
+
+
+def main():
+    import argparse
+
+    from src.config_loader import load_config, get_server_config, get_archive_config
+    from src.transmitter import create_transmitter
+
+    parser = argparse.ArgumentParser(description='Query or replay the local metrics archive')
+    parser.add_argument('command', choices=['query', 'replay'])
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--from', dest='start', help='ISO 8601 start time (default: beginning)')
+    parser.add_argument('--to', dest='end', help='ISO 8601 end time (default: now)')
+    parser.add_argument('--rate', type=float, default=500, help='metrics per second to replay')
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    reader = ArchiveReader(get_archive_config(config).get('path', 'archive'))
+    start = datetime.fromisoformat(args.start).timestamp() if args.start else 0.0
+    end = datetime.fromisoformat(args.end).timestamp() if args.end else time.time()
+
+    if args.command == 'query':
+        count = 0
+        first = last = None
+        for timestamp, _ in reader.read_range(start, end):
+            first = first or timestamp
+            last = timestamp
+            count += 1
+        print(f"{count} archived metrics in range")
+        if count:
+            print(f"first: {datetime.fromtimestamp(first).isoformat()}, "
+                  f"last: {datetime.fromtimestamp(last).isoformat()}")
+        return
+
+    server_cfg = get_server_config(config)
+    transmitter = create_transmitter(server_cfg)
+    failed_at = replay(reader, transmitter, start, end, rate=args.rate, batch_size=args.batch_size)
+    if failed_at is not None:
+        print(f"[Error] Replay stopped; resume with --from {datetime.fromtimestamp(failed_at).isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,90 @@
-from typing import Dict, Any
-from core import cpu, memory, disk, network, gpu, system
+from typing import Callable, Dict, Any, Optional
+from core import cpu, memory, disk, network, gpu, system, cgroup
+
+from src.watchdog import BudgetedCollector
+
+
+def _collect_disk() -> Dict[str, Any]:
+    return {
+        'usage_per_partition': disk.get_disk_usage_per_partition(),
+        'io_total': disk.get_disk_io_total()
+    }
+
+
+def _collect_gpu() -> Optional[Dict[str, Any]]:
+    try:
+        return gpu.get_gpu_dynamic_metrics()
+    except AttributeError:
+        return None
+
+
+COLLECTORS = {
+    'cpu': cpu.get_cpu_dynamic_metrics,
+    'memory': memory.get_memory_dynamic_metrics,
+    'disk': _collect_disk,
+    'network': network.get_network_info,
+    'system': system.get_system_dynamic_metrics,
+    'gpu': _collect_gpu,
+    'cgroup': cgroup.get_cgroup_dynamic_metrics,
+}
+
+# Modules that stay off unless enabled explicitly in config.yaml.
+OPT_IN_MODULES = ('cgroup',)
 
 
 class MetricsCollector:
 
-    def __init__(self, enabled_modules: Dict[str, bool], client_id: str):
+    def __init__(self, enabled_modules: Dict[str, bool], client_id: str, budget: Optional[Dict[str, Any]] = None,
+                 collectors: Optional[Dict[str, Callable[[], Any]]] = None):
         self.enabled_modules = enabled_modules
         self.client_id = client_id
 
-        network.get_network_info()
+        budget = budget or {}
+        default_timeout = budget.get('timeout', 1.0)
+        module_timeouts = budget.get('modules', {})
+        collectors = collectors or COLLECTORS
+
+        self.collectors: Dict[str, BudgetedCollector] = {}
+        for name, func in collectors.items():
+            if not self.enabled_modules.get(name, name not in OPT_IN_MODULES):
+                continue
+            self.collectors[name] = BudgetedCollector(
+                name=name,
+                func=func,
+                budget=module_timeouts.get(name, default_timeout),
+                degrade_after=budget.get('degrade_after', 3),
+                disable_after=budget.get('disable_after', 10),
+                max_cadence=budget.get('max_cadence', 8),
+                reprobe_after=budget.get('reprobe_after', 60)
+            )
+
+        if collectors.get('network') is network.get_network_info:
+            network.get_network_info()
 
     def get_full_metrics(self) -> Dict[str, Any]:
         """
         Collects all enabled dynamic metrics from the core modules and returns
         them as a single dictionary, sending the raw data as requested.
+
+        Modules that overran their time budget report their last good value
+        and are listed under 'stale'; disabled modules are left out until a
+        re-probe succeeds.
         """
         payload: Dict[str, Any] = {
             'client_id': self.client_id
         }
+        stale = []
+
+        for name, collector in self.collectors.items():
+            value, is_stale = collector.collect()
+            if collector.disabled:
+                continue
+
+            payload[name] = value
+            if is_stale:
+                stale.append(name)
 
-        if self.enabled_modules.get('cpu', True):
-            payload['cpu'] = cpu.get_cpu_dynamic_metrics()
-
-        if self.enabled_modules.get('memory', True):
-            payload['memory'] = memory.get_memory_dynamic_metrics()
-
-        if self.enabled_modules.get('disk', True):
-            payload['disk'] = {
-                'usage_per_partition': disk.get_disk_usage_per_partition(),
-                'io_total': disk.get_disk_io_total()
-            }
-
-        if self.enabled_modules.get('network', True):
-            payload['network'] = network.get_network_info()
-        
-        if self.enabled_modules.get('system', True):
-            payload['system'] = system.get_system_dynamic_metrics()
-        
-        if self.enabled_modules.get('gpu', True):
-            try:
-                payload['gpu'] = gpu.get_gpu_dynamic_metrics()
-            except AttributeError:
-                payload['gpu'] = None
+        if stale:
+            payload['stale'] = stale
 
         return payload
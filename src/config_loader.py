@@ -29,3 +29,19 @@ def get_logging_config(config: Dict[str, Any]) -> Dict[str, Any]:
 
 def get_client_config(config: Dict[str, Any]) -> Dict[str, Any]:
     return config.get('client', {})
+
+
+def get_relay_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    return config.get('relay', {})
+
+
+def get_split_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    return config.get('split', {})
+
+
+def get_archive_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    return config.get('archive', {})
+
+
+def get_profile_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    return config.get('profile', {})
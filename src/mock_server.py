@@ -0,0 +1,156 @@
+"""Stand-in ingest server with fault injection, for load tests without a real backend."""
+
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Any, Optional
+
+
+class _IngestHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class MockIngestServer:
+    """
+    Accepts the agent ingest protocol (a JSON object or array POSTed to
+    `endpoint`) and answers each request with one of the configured faults:
+
+    - latency (+ up to latency_jitter): seconds to wait before answering
+    - error_rate: fraction of requests answered with 500
+    - throttle_rate: fraction of requests answered with 429
+    - reset_rate: fraction of connections reset without any response
+
+    Accepted metrics are counted and, if given, passed to `on_metric`.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, endpoint: str = '/api/metrics/',
+                 latency: float = 0.0, latency_jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, reset_rate: float = 0.0,
+                 on_metric: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.endpoint = endpoint
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.reset_rate = reset_rate
+        self.on_metric = on_metric
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.metrics = 0
+        self.statuses: Dict[str, int] = {}
+
+        self.server = _IngestHTTPServer((host, port), self._make_handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='mock-ingest', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _count(self, status: str, metrics: int = 0):
+        with self.lock:
+            self.requests += 1
+            self.metrics += metrics
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def _make_handler(self):
+        mock = self
+
+        class MockIngestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+
+                if self.path != mock.endpoint:
+                    mock._count('404')
+                    self._reply(404)
+                    return
+
+                if mock.latency or mock.latency_jitter:
+                    time.sleep(mock.latency + random.uniform(0, mock.latency_jitter))
+
+                roll = random.random()
+                if roll < mock.reset_rate:
+                    mock._count('reset')
+                    # SO_LINGER with a zero timeout makes close() send a RST.
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    self.close_connection = True
+                    return
+                roll -= mock.reset_rate
+                if roll < mock.error_rate:
+                    mock._count('500')
+                    self._reply(500)
+                    return
+                roll -= mock.error_rate
+                if roll < mock.throttle_rate:
+                    mock._count('429')
+                    self._reply(429)
+                    return
+
+                try:
+                    data = json.loads(body)
+                except json.JSONDecodeError:
+                    mock._count('400')
+                    self._reply(400)
+                    return
+
+                metrics = data if isinstance(data, list) else [data]
+                if mock.on_metric is not None:
+                    for metric in metrics:
+                        mock.on_metric(metric)
+                mock._count('200', len(metrics))
+                self._reply(200)
+
+            def _reply(self, status: int):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return MockIngestHandler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mock metrics ingest server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--endpoint', default='/api/metrics/')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--latency-jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--reset-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockIngestServer(
+        host=args.host, port=args.port, endpoint=args.endpoint,
+        latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, reset_rate=args.reset_rate
+    )
+    print(f"Mock ingest server listening on {server.url}{server.endpoint}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nRequests: {server.requests}, Metrics: {server.metrics}, Statuses: {server.statuses}")
@@ -1,50 +1,64 @@
 """Main monitoring service."""
 
 import time
-import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
+from src import profiler
 from src.collector import MetricsCollector
-from src.transmitter import HTTPTransmitter
+from src.transmitter import Transmitter
 
 
 class MonitorService:
     
-    def __init__(self, collector: MetricsCollector, transmitter: HTTPTransmitter, interval: float, batch_size: int):
+    def __init__(self, collector: MetricsCollector, transmitter: Transmitter, interval: float, batch_size: int,
+                 max_batch_bytes: Optional[int] = None, max_batch_age: Optional[float] = None):
         self.collector = collector
         self.transmitter = transmitter
         self.interval = interval
         self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_age = max_batch_age
         self.buffer: List[Dict[str, Any]] = []
+        # Each sample is encoded once when buffered; the transmitter sends
+        # these bytes instead of encoding the sample again.
+        self.encoded: List[bytes] = []
+        # Encoded size of the buffer, kept up to date as samples are added,
+        # and the monotonic time its oldest sample was added.
+        self.buffer_bytes = 0
+        self.buffer_started: Optional[float] = None
         self.running = False
 
     def start(self):
         self.running = True
 
         print(f"Starting system monitor...")
-        print(f"Interval: {self.interval}s, Batch size: {self.batch_size}")
+        print(f"Interval: {self.interval}s, Batch size: {self.batch_size}, "
+              f"Max batch bytes: {self.max_batch_bytes}, Max batch age: {self.max_batch_age}s")
 
-        # printed_once = False
         try:
             while self.running:
-                metrics = self.collector.get_full_metrics()
-
-                # if not printed_once:
-                #     print(json.dumps(metrics, indent=2, ensure_ascii=False))
-                #     printed_once = True
-
-                self.buffer.append(metrics)
-
-                if len(self.buffer) >= self.batch_size:
-                    self._flush_buffer()
-
-                time.sleep(self.interval)
+                self.run_once()
+                self._sleep_until(time.monotonic() + self.interval)
 
         except KeyboardInterrupt:
             print("\nReceived shutdown signal")
         finally:
             self.stop()
 
+    def run_once(self):
+        """Collects one sample and flushes the buffer if any flush limit is reached."""
+        profiler.begin_cycle()
+
+        with profiler.phase('collect'):
+            metrics = self.collector.get_full_metrics()
+        self._add_to_buffer(metrics)
+
+        if self._flush_due():
+            with profiler.phase('send'):
+                self._flush_buffer()
+
+        profiler.end_cycle()
+
     def stop(self):
         self.running = False
         if self.buffer:
@@ -52,13 +66,53 @@ class MonitorService:
             self._flush_buffer()
         print("Monitor stopped")
 
+    def _add_to_buffer(self, metrics: Dict[str, Any] | bytes):
+        # Sources that already hand out encoded samples (split mode) pass bytes.
+        body = self.transmitter.encode(metrics)
+        if body is None:
+            print("[Warning] Dropping a sample that cannot be encoded")
+            return
+
+        if not self.buffer:
+            self.buffer_started = time.monotonic()
+        self.buffer.append(metrics)
+        self.encoded.append(body)
+        # +1 for the separator between samples in an encoded batch.
+        self.buffer_bytes += len(body) + 1
+
+    def _flush_due(self) -> bool:
+        if len(self.buffer) >= self.batch_size:
+            return True
+        if self.max_batch_bytes is not None and self.buffer_bytes >= self.max_batch_bytes:
+            return True
+        if (self.max_batch_age is not None and self.buffer
+                and time.monotonic() - self.buffer_started >= self.max_batch_age):
+            return True
+        return False
+
+    def _sleep_until(self, next_tick: float):
+        """Sleeps until the next tick, flushing on the way if the oldest sample gets too old."""
+        if self.max_batch_age is not None and self.buffer:
+            deadline = self.buffer_started + self.max_batch_age
+            # A deadline already in the past was handled (or failed) in run_once.
+            if time.monotonic() < deadline < next_tick:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                with profiler.phase('send'):
+                    self._flush_buffer()
+
+        time.sleep(max(0.0, next_tick - time.monotonic()))
+
     def _flush_buffer(self):
         if not self.buffer:
             return
 
-        success = self.transmitter.send_batch(self.buffer)
+        success = self.transmitter.send_batch(self.buffer, self.encoded)
         if success:
-            print(f"Sent {len(self.buffer)} metrics")
+            print(f"Sent {len(self.buffer)} metrics ({self.buffer_bytes} bytes)" if self.max_batch_bytes is not None
+                  else f"Sent {len(self.buffer)} metrics")
             self.buffer.clear()
+            self.encoded.clear()
+            self.buffer_bytes = 0
+            self.buffer_started = None
         else:
             print(f"Failed to send {len(self.buffer)} metrics")
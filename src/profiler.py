@@ -0,0 +1,230 @@
+"""
+Built-in profiling of collection cycles.
+
+When armed (with --profile or at runtime by SIGUSR1), the next `cycles`
+calls of MonitorService.run_once are profiled:
+
+- while any thread is inside a phase, a sampling thread records the stack
+  of every thread that ran since the previous sample, every
+  `sample_interval` seconds. Each stack is prefixed with that thread's own
+  phase (collect, serialize, send, or 'other' outside any phase; collector
+  worker threads carry the phase of the thread they run for) and
+  weighted by the CPU microseconds the thread used in between, so threads
+  blocked on I/O or locks drop out. The result is written as collapsed
+  stacks that flamegraph.pl or speedscope can render. Without per-thread
+  CPU times (non-Linux) every sample counts 1;
+- tracemalloc snapshots are taken around each phase and the allocation
+  differences are summed per phase and source line.
+
+Code marks its phases with `profiler.phase(name)`, which costs a single
+check while no profiling run is active.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+
+class CycleProfiler:
+
+    def __init__(self, cycles: int = 10, output_dir: str = 'profiles', sample_interval: float = 0.005,
+                 top_allocations: int = 25):
+        self.cycles = cycles
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.top_allocations = top_allocations
+
+        self.active = False
+        self.armed = False
+        self.remaining = 0
+        self.phases: Dict[int, Tuple[str, ...]] = {}
+        self.stacks: Counter = Counter()
+        self.allocations: Dict[Tuple[str, str], list] = {}
+        self.sampler: Optional[threading.Thread] = None
+
+    def arm(self):
+        """Requests a profiling run starting with the next cycle; safe to call from a signal handler."""
+        self.armed = True
+
+    def begin_cycle(self):
+        if self.armed and not self.active:
+            self.armed = False
+            self._start()
+
+    def end_cycle(self):
+        if not self.active:
+            return
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self._finish()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        thread_id = threading.get_ident()
+        outer = self.phases.get(thread_id, ())
+        # Snapshot time is the profiler's own overhead, keep it out of the phases.
+        self.phases[thread_id] = ('profiler',)
+        before = tracemalloc.take_snapshot()
+        self.phases[thread_id] = outer + (name,)
+        try:
+            yield
+        finally:
+            self.phases[thread_id] = ('profiler',)
+            after = tracemalloc.take_snapshot()
+            self._record_allocations(';'.join(outer + (name,)), before, after)
+            if outer:
+                self.phases[thread_id] = outer
+            else:
+                del self.phases[thread_id]
+
+    @contextlib.contextmanager
+    def tagged(self, phases: Tuple[str, ...]):
+        """Counts the calling thread's samples under `phases`, e.g. while it works for another thread."""
+        thread_id = threading.get_ident()
+        self.phases[thread_id] = phases
+        try:
+            yield
+        finally:
+            self.phases.pop(thread_id, None)
+
+    def _start(self):
+        print(f"[Profiler] Profiling the next {self.cycles} cycles...")
+        self.active = True
+        self.remaining = self.cycles
+        self.phases = {}
+        self.stacks = Counter()
+        self.allocations = {}
+        tracemalloc.start(10)
+        self.sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+        self.sampler.start()
+
+    def _finish(self):
+        self.active = False
+        self.sampler.join()
+        tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+
+        with open(base + '.collapsed', 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(base + '.alloc.txt', 'w') as f:
+            by_phase: Dict[str, list] = {}
+            for (phase, location), (size, count) in self.allocations.items():
+                by_phase.setdefault(phase, []).append((size, count, location))
+            for phase, entries in sorted(by_phase.items()):
+                f.write(f"=== {phase} (summed over {self.cycles} cycles) ===\n")
+                for size, count, location in sorted(entries, reverse=True)[:self.top_allocations]:
+                    f.write(f"{size / 1024:10.1f} KiB {count:8d} blocks  {location}\n")
+                f.write("\n")
+
+        print(f"[Profiler] Wrote {base}.collapsed and {base}.alloc.txt")
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        cpu_seen: Dict[int, int] = {}
+        while self.active:
+            time.sleep(self.sample_interval)
+            threads = {thread.ident: thread for thread in threading.enumerate()}
+            # Read CPU times on every tick so time spent between phases is not
+            # charged to the first sample of the next phase.
+            cpu_used, previous, cpu_seen = {}, cpu_seen, {}
+            for thread_id, thread in threads.items():
+                cpu_ns = _thread_cpu_ns(thread.native_id)
+                if cpu_ns is not None:
+                    cpu_used[thread_id] = cpu_ns - previous.get(thread_id, cpu_ns)
+                    cpu_seen[thread_id] = cpu_ns
+
+            phases = dict(self.phases)
+            if not phases:
+                continue
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or thread_id not in threads:
+                    continue
+                if thread_id in cpu_used:
+                    weight = cpu_used[thread_id] // 1000
+                    if weight <= 0:
+                        continue  # blocked or idle since the last sample
+                elif cpu_seen:
+                    continue  # CPU times work here; this thread just started
+                else:
+                    weight = 1
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                prefix = ';'.join(phases.get(thread_id, ())) or 'other'
+                self.stacks[';'.join([prefix, threads[thread_id].name] + frames[::-1])] += weight
+
+    def _record_allocations(self, phase: str, before, after):
+        ignore = (tracemalloc.__file__, __file__)
+        for stat in after.compare_to(before, 'lineno'):
+            if stat.size_diff <= 0 or stat.traceback[0].filename in ignore:
+                continue
+            key = (phase, str(stat.traceback))
+            total = self.allocations.setdefault(key, [0, 0])
+            total[0] += stat.size_diff
+            total[1] += stat.count_diff
+
+
+def _thread_cpu_ns(native_id: Optional[int]) -> Optional[int]:
+    """CPU time a thread has run for, from its schedstat; None where that is unavailable."""
+    if native_id is None:
+        return None
+    try:
+        with open(f"/proc/self/task/{native_id}/schedstat") as f:
+            return int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_profiler: Optional[CycleProfiler] = None
+
+
+def install(profiler: CycleProfiler):
+    global _profiler
+    _profiler = profiler
+
+
+def phase(name: str):
+    """Marks a profiled phase; a no-op unless a profiling run is active."""
+    if _profiler is not None and _profiler.active:
+        return _profiler.phase(name)
+    return contextlib.nullcontext()
+
+
+def is_active() -> bool:
+    return _profiler is not None and _profiler.active
+
+
+def current_phases() -> Tuple[str, ...]:
+    """Phases the calling thread is in; empty unless a profiling run is active."""
+    if _profiler is not None and _profiler.active:
+        return _profiler.phases.get(threading.get_ident(), ())
+    return ()
+
+
+def tagged(phases: Tuple[str, ...]):
+    """Runs a block under another thread's `phases` (from current_phases()), without allocation snapshots."""
+    if phases and _profiler is not None and _profiler.active:
+        return _profiler.tagged(phases)
+    return contextlib.nullcontext()
+
+
+def begin_cycle():
+    if _profiler is not None:
+        _profiler.begin_cycle()
+
+
+def end_cycle():
+    if _profiler is not None:
+        _profiler.end_cycle()
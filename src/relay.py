@@ -0,0 +1,182 @@
+"""Relay mode: accepts metrics from nearby agents and forwards them upstream in large batches."""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+
+from src.transmitter import Transmitter
+
+MAX_RETRY_BACKOFF = 30.0  # seconds
+
+
+def _reject_constant(name: str):
+    raise ValueError(f"non-finite number {name}")
+
+
+class RelayService:
+    """
+    Speaks the agent ingest protocol (a JSON object or array POSTed to
+    `endpoint`) on the listening side, buffers everything it receives and
+    forwards it upstream as JSON arrays of up to `max_batch` metrics over
+    `connections` pooled connections.
+    """
+
+    def __init__(self, transmitter: Transmitter, host: str, port: int, endpoint: str,
+                 max_batch: int = 500, flush_interval: float = 2.0,
+                 max_buffer: int = 100000, connections: int = 2):
+        self.transmitter = transmitter
+        self.host = host
+        self.port = port
+        self.endpoint = endpoint
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.connections = connections
+
+        self.buffer: deque = deque()
+        self.dropped = 0
+        self.cond = threading.Condition()
+        self.running = False
+        self.server = None
+        self.forwarders: List[threading.Thread] = []
+
+    def start(self):
+        self.running = True
+        self.server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.server.daemon_threads = True
+
+        for i in range(self.connections):
+            thread = threading.Thread(target=self._forward_loop, name=f'relay-forwarder-{i}', daemon=True)
+            thread.start()
+            self.forwarders.append(thread)
+
+        print(f"Starting relay on {self.host}:{self.port}{self.endpoint}")
+        print(f"Forwarding to {self.transmitter.target}, "
+              f"Batch: {self.max_batch}, Connections: {self.connections}")
+
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nReceived shutdown signal")
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.server_close()
+
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for thread in self.forwarders:
+            thread.join()
+
+        if self.buffer:
+            print(f"Flushing remaining {len(self.buffer)} metrics...")
+            while self.buffer:
+                batch = self._take_batch()
+                result = self.transmitter.send_checked(batch)
+                if result is None:
+                    print(f"[Error] Upstream rejected {len(batch)} metrics, dropping them")
+                elif not result:
+                    print(f"[Error] Dropping {len(batch) + len(self.buffer)} metrics on shutdown")
+                    break
+        print("Relay stopped")
+
+    def enqueue(self, metrics: List[Dict[str, Any]]):
+        with self.cond:
+            self.buffer.extend(metrics)
+            self._trim_overflow()
+            if len(self.buffer) >= self.max_batch:
+                self.cond.notify()
+
+    def _trim_overflow(self):
+        """Drops the oldest metrics beyond `max_buffer`. Caller holds `cond`."""
+        overflow = len(self.buffer) - self.max_buffer
+        if overflow > 0:
+            for _ in range(overflow):
+                self.buffer.popleft()
+            self.dropped += overflow
+            print(f"[Warning] Relay buffer full, dropped {overflow} oldest metrics ({self.dropped} total)")
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        count = min(self.max_batch, len(self.buffer))
+        return [self.buffer.popleft() for _ in range(count)]
+
+    def _forward_loop(self):
+        failures = 0
+        while True:
+            with self.cond:
+                deadline = time.monotonic() + self.flush_interval
+                while self.running and len(self.buffer) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                if not self.running:
+                    return
+                batch = self._take_batch()
+
+            if not batch:
+                continue
+
+            result = self.transmitter.send_checked(batch)
+            if result:
+                failures = 0
+                print(f"Forwarded {len(batch)} metrics")
+            elif result is None:
+                # Retrying cannot help and would hold up everything queued behind it.
+                with self.cond:
+                    self.dropped += len(batch)
+                print(f"[Error] Upstream rejected {len(batch)} metrics, dropping them ({self.dropped} total)")
+            else:
+                failures += 1
+                backoff = min(self.flush_interval * 2 ** (failures - 1), MAX_RETRY_BACKOFF)
+                # Put the batch back in front so ordering is kept for the retry.
+                print(f"Failed to forward {len(batch)} metrics, requeueing and retrying in {backoff:.1f}s")
+                with self.cond:
+                    self.buffer.extendleft(reversed(batch))
+                    self._trim_overflow()
+                    deadline = time.monotonic() + backoff
+                    while self.running:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(remaining)
+
+    def _make_handler(self):
+        relay = self
+
+        class IngestHandler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                if self.path != relay.endpoint:
+                    self.send_error(404)
+                    return
+
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    if length < 0:
+                        raise ValueError(f"negative Content-Length {length}")
+                    data = json.loads(self.rfile.read(length), parse_constant=_reject_constant)
+                    metrics = data if isinstance(data, list) else [data]
+                    if not all(isinstance(metric, dict) for metric in metrics):
+                        raise ValueError("metrics must be JSON objects")
+                except ValueError:
+                    # Covers a bad Content-Length, invalid JSON, NaN/Infinity,
+                    # non-object metrics and non-UTF-8 bodies.
+                    self.send_error(400, 'Invalid request body')
+                    return
+
+                relay.enqueue(metrics)
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return IngestHandler
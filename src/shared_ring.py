@@ -0,0 +1,93 @@
+"""Single-producer/single-consumer sample ring in shared memory."""
+
+import struct
+from multiprocessing import shared_memory
+from typing import Optional
+
+# magic, slot_count, slot_size, write_seq, read_seq, dropped
+_HEADER = struct.Struct('<IIIxxxxQQQ')
+_HEADER_SIZE = 64
+_SLOT_LENGTH = struct.Struct('<I')
+_MAGIC = 0x534D5247  # 'SMRG'
+
+_WRITE_SEQ_OFFSET = 16
+_READ_SEQ_OFFSET = 24
+_DROPPED_OFFSET = 32
+_SEQ = struct.Struct('<Q')
+
+
+class SampleRing:
+    """
+    Fixed-layout ring of `slot_count` slots of `slot_size` bytes, each holding
+    one length-prefixed encoded sample.
+
+    The writer publishes a slot by bumping write_seq after the payload is in
+    place. The reader only advances read_seq (commit) once the samples have
+    been shipped, so samples survive a restart of either process for as long
+    as the segment itself exists. When the ring is full new samples are
+    dropped and counted rather than overwriting unshipped ones.
+    """
+
+    def __init__(self, name: Optional[str] = None, slot_count: int = 1024, slot_size: int = 65536,
+                 create: bool = False):
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=_HEADER_SIZE + slot_count * slot_size)
+            _HEADER.pack_into(self.shm.buf, 0, _MAGIC, slot_count, slot_size, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        magic, self.slot_count, self.slot_size, _, _, _ = _HEADER.unpack_from(self.shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Shared memory segment {self.shm.name} is not a sample ring")
+        self.max_payload = self.slot_size - _SLOT_LENGTH.size
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_seq(self) -> int:
+        return _SEQ.unpack_from(self.shm.buf, _WRITE_SEQ_OFFSET)[0]
+
+    @property
+    def read_seq(self) -> int:
+        return _SEQ.unpack_from(self.shm.buf, _READ_SEQ_OFFSET)[0]
+
+    @property
+    def dropped(self) -> int:
+        return _SEQ.unpack_from(self.shm.buf, _DROPPED_OFFSET)[0]
+
+    def put(self, data: bytes) -> bool:
+        """Writes one sample; returns False if it was dropped."""
+        write_seq = self.write_seq
+        if len(data) > self.max_payload or write_seq - self.read_seq >= self.slot_count:
+            _SEQ.pack_into(self.shm.buf, _DROPPED_OFFSET, self.dropped + 1)
+            return False
+
+        offset = self._slot_offset(write_seq)
+        _SLOT_LENGTH.pack_into(self.shm.buf, offset, len(data))
+        start = offset + _SLOT_LENGTH.size
+        self.shm.buf[start:start + len(data)] = data
+        _SEQ.pack_into(self.shm.buf, _WRITE_SEQ_OFFSET, write_seq + 1)
+        return True
+
+    def view(self, seq: int) -> memoryview:
+        """Returns a view of sample `seq` in place; valid until it is committed."""
+        offset = self._slot_offset(seq)
+        length = _SLOT_LENGTH.unpack_from(self.shm.buf, offset)[0]
+        start = offset + _SLOT_LENGTH.size
+        return self.shm.buf[start:start + length]
+
+    def commit(self, seq: int):
+        """Marks every sample before `seq` as shipped, freeing its slot."""
+        _SEQ.pack_into(self.shm.buf, _READ_SEQ_OFFSET, seq)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+    def _slot_offset(self, seq: int) -> int:
+        return _HEADER_SIZE + (seq % self.slot_count) * self.slot_size
@@ -0,0 +1,287 @@
+"""
+Multi-agent load simulator.
+
+Runs N virtual agents in one process against a local MockIngestServer. Each
+agent is a real MetricsCollector + HTTPTransmitter + MonitorService; only the
+collector functions are replaced with synthetic ones, so the numbers reflect
+the agent's own batching, retry and transmission code.
+
+Usage:
+    python -m src.simulator --agents 200 --duration 60 --scenario flaky
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Tuple
+
+from src.collector import MetricsCollector
+from src.mock_server import MockIngestServer
+from src.monitor_service import MonitorService
+from src.transmitter import HTTPTransmitter
+
+SCENARIOS = {
+    'healthy': {},
+    'slow': {'latency': 0.2, 'latency_jitter': 0.3},
+    'flaky': {'error_rate': 0.1, 'latency': 0.01},
+    'throttled': {'throttle_rate': 0.3},
+    'resets': {'reset_rate': 0.1},
+    'outage': {'error_rate': 1.0},
+}
+
+
+def synthetic_collectors(interfaces: int, partitions: int) -> Tuple[Dict[str, Callable[[], Any]], List[int]]:
+    """
+    Returns collector functions producing payloads shaped like the real ones,
+    and a one-element list holding the number of samples generated so far.
+    """
+    generated = [0]
+
+    def cpu():
+        return {
+            'usage_percent': random.uniform(0, 100),
+            'freq_current': 3400.0,
+            'temperature': random.uniform(30, 90),
+            'load_average': (1.0, 0.8, 0.5),
+            'iowait': random.uniform(0, 100),
+            'user': random.uniform(0, 1e6),
+            'system': random.uniform(0, 1e6),
+            'idle': random.uniform(0, 1e7),
+            'ctx_switches': random.randint(0, 10 ** 9),
+            'interrupts': random.randint(0, 10 ** 9),
+            'soft_interrupts': random.randint(0, 10 ** 9)
+        }
+
+    def memory():
+        return {key: random.randint(0, 16 * 1024 ** 3) for key in (
+            'total', 'available', 'used', 'free', 'active', 'inactive', 'buffers', 'cached',
+            'shared', 'slab', 'swap_total', 'swap_used', 'swap_free', 'swap_sin', 'swap_sout')}
+
+    def disk():
+        return {
+            'usage_per_partition': {
+                f"/mnt/disk{i}": {
+                    'total': 500 * 1024 ** 3,
+                    'used': random.randint(0, 500 * 1024 ** 3),
+                    'free': random.randint(0, 500 * 1024 ** 3),
+                    'percent': random.uniform(0, 100)
+                } for i in range(partitions)
+            },
+            'io_total': {key: random.randint(0, 10 ** 9) for key in (
+                'read_count', 'write_count', 'read_bytes', 'write_bytes', 'read_time',
+                'write_time', 'read_merged_count', 'write_merged_count', 'busy_time')}
+        }
+
+    def network():
+        return {
+            'summary': {'total_interfaces': interfaces, 'active_interfaces': interfaces, 'down_interfaces': 0},
+            'interfaces': {
+                f"eth{i}": {
+                    'state': 'up',
+                    'mtu': 1500,
+                    'speed': 10000,
+                    'is_ethernet': True,
+                    'input_bytes_per_sec': random.uniform(0, 1e8),
+                    'output_bytes_per_sec': random.uniform(0, 1e8),
+                    'statistics': {key: random.randint(0, 10 ** 12) for key in (
+                        'rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets')},
+                    'errors': {key: 0 for key in (
+                        'collisions', 'rx_errors', 'tx_errors', 'rx_dropped', 'tx_dropped')}
+                } for i in range(interfaces)
+            }
+        }
+
+    def system():
+        # Called once per sample, so its sequence number identifies the sample.
+        generated[0] += 1
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'uptime': 3600.0,
+            'users': [],
+            'seq': generated[0]
+        }
+
+    return {'cpu': cpu, 'memory': memory, 'disk': disk, 'network': network, 'system': system}, generated
+
+
+class VirtualAgent:
+
+    def __init__(self, agent_id: int, server_url: str, endpoint: str, args: argparse.Namespace):
+        self.agent_id = agent_id
+        collectors, self.generated = synthetic_collectors(args.interfaces, args.partitions)
+
+        self.transmitter = HTTPTransmitter(
+            server_url=server_url,
+            endpoint=endpoint,
+            timeout=args.timeout,
+            max_retries=args.max_retries
+        )
+        self.latencies: List[float] = []
+        self._wrap_send()
+
+        self.service = MonitorService(
+            collector=MetricsCollector(
+                enabled_modules={},
+                client_id=f"sim-agent-{agent_id}",
+                collectors=collectors
+            ),
+            transmitter=self.transmitter,
+            interval=args.interval,
+            batch_size=args.batch_size,
+            max_batch_bytes=args.max_batch_bytes,
+            max_batch_age=args.max_batch_age
+        )
+        self.batches = 0
+        self._wrap_flush()
+
+    def _wrap_send(self):
+        send = self.transmitter.send
+
+        def timed_send(data):
+            start = time.perf_counter()
+            try:
+                return send(data)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+
+        self.transmitter.send = timed_send
+
+    def _wrap_flush(self):
+        send_batch = self.transmitter.send_batch
+
+        def counted_send_batch(metrics, encoded=None):
+            success = send_batch(metrics, encoded)
+            if success:
+                self.batches += 1
+            return success
+
+        self.transmitter.send_batch = counted_send_batch
+
+    def run(self, deadline: float, interval: float):
+        # Spread the agents over one interval so they do not tick in lockstep.
+        time.sleep(random.uniform(0, interval))
+        while time.monotonic() < deadline:
+            self.service.run_once()
+            # Sleep like MonitorService.start so max_batch_age can flush between ticks.
+            self.service._sleep_until(time.monotonic() + interval)
+        self.service.stop()
+
+
+def _rss_bytes() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_simulation(args: argparse.Namespace) -> Dict[str, Any]:
+    received = set()
+    received_lock = threading.Lock()
+
+    def on_metric(metric):
+        with received_lock:
+            received.add((metric.get('client_id'), (metric.get('system') or {}).get('seq')))
+
+    faults = dict(SCENARIOS[args.scenario])
+    for key in ('latency', 'latency_jitter', 'error_rate', 'throttle_rate', 'reset_rate'):
+        if getattr(args, key) is not None:
+            faults[key] = getattr(args, key)
+
+    server = MockIngestServer(endpoint='/api/metrics/', on_metric=on_metric, **faults)
+    server.start()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_start = _rss_bytes()
+    agents = [VirtualAgent(i, server.url, server.endpoint, args) for i in range(args.agents)]
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=agent.run, args=(deadline, args.interval), daemon=True)
+               for agent in agents]
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.monotonic() - start
+
+    traced_peak = 0
+    if args.tracemalloc:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    rss_end = _rss_bytes()
+    server.stop()
+
+    generated = sum(agent.generated[0] for agent in agents)
+    latencies = [latency for agent in agents for latency in agent.latencies]
+    return {
+        'scenario': args.scenario,
+        'faults': faults,
+        'agents': args.agents,
+        'elapsed': elapsed,
+        'batches': sum(agent.batches for agent in agents),
+        'batches_per_sec': sum(agent.batches for agent in agents) / elapsed,
+        'requests': server.requests,
+        'statuses': server.statuses,
+        'send_p50': _percentile(latencies, 50),
+        'send_p99': _percentile(latencies, 99),
+        'generated': generated,
+        'received': len(received),
+        'lost': generated - len(received),
+        'duplicates': server.metrics - len(received),
+        'rss_growth': rss_end - rss_start,
+        'traced_peak': traced_peak
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate many agents against a local mock ingest server')
+    parser.add_argument('--agents', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds')
+    parser.add_argument('--interval', type=float, default=1.0, help='collection interval (seconds)')
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--max-batch-bytes', type=int)
+    parser.add_argument('--max-batch-age', type=float, help='seconds')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--interfaces', type=int, default=4, help='synthetic NICs per sample')
+    parser.add_argument('--partitions', type=int, default=4, help='synthetic mounts per sample')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='healthy')
+    parser.add_argument('--latency', type=float)
+    parser.add_argument('--latency-jitter', type=float)
+    parser.add_argument('--error-rate', type=float)
+    parser.add_argument('--throttle-rate', type=float)
+    parser.add_argument('--reset-rate', type=float)
+    parser.add_argument('--tracemalloc', action='store_true', help='also report the traced Python heap peak (slower)')
+    args = parser.parse_args()
+
+    print(f"Simulating {args.agents} agents for {args.duration}s (scenario: {args.scenario})...")
+    result = run_simulation(args)
+
+    print("\n=== Simulation Result ===")
+    print(f"faults: {result['faults']}")
+    print(f"elapsed: {result['elapsed']:.1f} s")
+    print(f"batches/sec: {result['batches_per_sec']:.2f} ({result['batches']} batches)")
+    print(f"requests: {result['requests']} {result['statuses']}")
+    print(f"send latency p50: {result['send_p50'] * 1000:.1f} ms, p99: {result['send_p99'] * 1000:.1f} ms")
+    print(f"samples generated: {result['generated']}, received: {result['received']}, "
+          f"lost: {result['lost']}, duplicates: {result['duplicates']}")
+    print(f"memory growth (RSS): {result['rss_growth'] / 1024 ** 2:.1f} MB")
+    if args.tracemalloc:
+        print(f"traced peak: {result['traced_peak'] / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
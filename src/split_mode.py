@@ -0,0 +1,232 @@
+"""
+Split mode: collection and shipping run in separate processes.
+
+The collector process encodes each sample once and writes it into a
+SampleRing in shared memory. The shipper process takes the encoded bytes out
+of the ring without decoding them and sends them as they are through the
+usual MonitorService batching, committing the
+ring's read position only after a batch was sent. A supervisor owns the ring
+and restarts either process independently, so a crash on one side neither
+stops the other nor loses samples still in the ring.
+"""
+
+import json
+import multiprocessing
+import signal
+import time
+from typing import Dict, Any, Optional
+
+from src import profiler
+from src.collector import MetricsCollector
+from src.config_loader import get_server_config, get_collector_config, get_client_config, get_split_config
+from src.monitor_service import MonitorService
+from src.shared_ring import SampleRing
+from src.transmitter import create_transmitter
+
+
+class RingReader:
+    """Collector-compatible source that yields encoded samples from a SampleRing."""
+
+    def __init__(self, ring: SampleRing, poll_interval: float = 0.05):
+        self.ring = ring
+        self.poll_interval = poll_interval
+        self.cursor = ring.read_seq
+
+    def wait(self, deadline: Optional[float] = None) -> bool:
+        """Waits for the next sample until the monotonic `deadline`; False if none arrived by then."""
+        while self.cursor >= self.ring.write_seq:
+            if deadline is None:
+                time.sleep(self.poll_interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+        return True
+
+    def get_full_metrics(self) -> bytes:
+        """
+        Returns the next sample as the JSON bytes the collector wrote, which
+        Transmitter.encode() passes through unchanged. The payload is copied
+        out of the slot once rather than buffered as a view, so no view into
+        the shared memory outlives a failed flush when the ring is closed.
+        """
+        self.wait()
+        with self.ring.view(self.cursor) as view:
+            sample = bytes(view)
+        self.cursor += 1
+        return sample
+
+    def pending(self) -> int:
+        return self.ring.write_seq - self.cursor
+
+    def commit(self):
+        self.ring.commit(self.cursor)
+
+
+class ShipperService(MonitorService):
+    """MonitorService that frees ring slots only once their samples are sent."""
+
+    def run_once(self):
+        # Waiting for the next sample must not hold the buffer past its age limit.
+        deadline = None
+        if self.max_batch_age is not None and self.buffer:
+            deadline = self.buffer_started + self.max_batch_age
+            # A deadline already in the past was handled (or failed) in the previous run.
+            if deadline <= time.monotonic():
+                deadline = None
+
+        if not self.collector.wait(deadline):
+            with profiler.phase('send'):
+                self._flush_buffer()
+            return
+        super().run_once()
+
+    def stop(self):
+        # Drain what the collector wrote before it was stopped.
+        while self.collector.pending() > 0:
+            self._add_to_buffer(self.collector.get_full_metrics())
+        super().stop()
+
+    def _flush_buffer(self):
+        super()._flush_buffer()
+        if not self.buffer:
+            self.collector.commit()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    # Only the first SIGTERM interrupts; a second one must not cut the final flush short.
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+def _install_signal_handlers():
+    # Ctrl+C reaches the whole process group; only the supervisor reacts to
+    # it and stops the children with SIGTERM in the right order.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+
+
+def _collector_main(ring_name: str, config: Dict[str, Any]):
+    _install_signal_handlers()
+    collector_cfg = get_collector_config(config)
+    ring = SampleRing(name=ring_name)
+
+    collector = MetricsCollector(
+        enabled_modules=collector_cfg.get('modules'),
+        client_id=get_client_config(config).get('id'),
+        budget=collector_cfg.get('budget')
+    )
+
+    try:
+        while True:
+            try:
+                # Encoded the way Transmitter.encode() would; the shipper sends these bytes as is.
+                data = json.dumps(collector.get_full_metrics(), allow_nan=False).encode()
+            except ValueError as e:
+                print(f"[Error] Metric payload is not valid JSON, dropping it: {e}")
+                time.sleep(collector_cfg.get('interval'))
+                continue
+            if not ring.put(data):
+                print(f"[Warning] Sample ring full or sample too large ({len(data)} bytes), "
+                      f"dropped {ring.dropped} samples so far")
+            time.sleep(collector_cfg.get('interval'))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+def _shipper_main(ring_name: str, config: Dict[str, Any]):
+    _install_signal_handlers()
+    server_cfg = get_server_config(config)
+    collector_cfg = get_collector_config(config)
+    ring = SampleRing(name=ring_name)
+
+    transmitter = create_transmitter(server_cfg)
+
+    # Samples arrive at the collector's pace; run_once waits for one, or
+    # flushes once the oldest buffered sample reaches max_batch_age.
+    service = ShipperService(
+        collector=RingReader(ring),
+        transmitter=transmitter,
+        interval=0,
+        batch_size=collector_cfg.get('batch_size'),
+        max_batch_bytes=collector_cfg.get('max_batch_bytes'),
+        max_batch_age=collector_cfg.get('max_batch_age')
+    )
+    try:
+        service.start()
+    finally:
+        ring.close()
+
+
+class SplitSupervisor:
+
+    def __init__(self, config: Dict[str, Any]):
+        split_cfg = get_split_config(config)
+        self.config = config
+        self.restart_delay = split_cfg.get('restart_delay', 1.0)
+        self.ring = SampleRing(
+            slot_count=split_cfg.get('slots', 1024),
+            slot_size=split_cfg.get('slot_size', 65536),
+            create=True
+        )
+        self.targets = {'collector': _collector_main, 'shipper': _shipper_main}
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self.restarts = {name: 0 for name in self.targets}
+        self.running = False
+
+    def start(self):
+        self.running = True
+        print(f"Starting split mode, ring {self.ring.name}: "
+              f"{self.ring.slot_count} slots x {self.ring.slot_size} bytes")
+
+        try:
+            for name in self.targets:
+                self._spawn(name)
+
+            while self.running:
+                for name, process in self.processes.items():
+                    if not process.is_alive():
+                        self.restarts[name] += 1
+                        print(f"[Warning] {name} process exited with code {process.exitcode}, "
+                              f"restarting (restart #{self.restarts[name]})")
+                        time.sleep(self.restart_delay)
+                        self._spawn(name)
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\nReceived shutdown signal")
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        # Stop the collector first so nothing lands in the ring after the
+        # shipper's final flush.
+        for name in ('collector', 'shipper'):
+            process = self.processes.get(name)
+            if process is not None and process.is_alive():
+                process.terminate()
+                process.join(timeout=30)
+                if process.is_alive():
+                    # A second SIGTERM is ignored during the final flush, so force it.
+                    print(f"[Warning] {name} process did not stop within 30s, killing it")
+                    process.kill()
+                    process.join()
+        pending = self.ring.write_seq - self.ring.read_seq
+        if pending:
+            print(f"[Warning] {pending} samples were still unsent in the ring")
+        self.ring.close()
+        self.ring.unlink()
+        print("Split mode stopped")
+
+    def _spawn(self, name: str):
+        process = multiprocessing.Process(
+            target=self.targets[name],
+            args=(self.ring.name, self.config),
+            name=f"monitor-{name}",
+            daemon=True
+        )
+        process.start()
+        self.processes[name] = process
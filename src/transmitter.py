@@ -1,23 +1,97 @@
+import abc
+import itertools
+import json
+import random
+import socket
+import struct
+import threading
 import requests
-from typing import Dict, Any, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional
 import time
 
-class HTTPTransmitter:
+from src import profiler
 
-    def __init__(self, server_url: str, endpoint: str, timeout: int, max_retries: int):
+
+class Transmitter(abc.ABC):
+    """Interface MonitorService ships metrics through."""
+
+    @property
+    @abc.abstractmethod
+    def target(self) -> str:
+        """Where metrics go, for log messages."""
+
+    @abc.abstractmethod
+    def send(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> bool:
+        """Sends one payload; bytes are taken as already produced by encode()."""
+
+    @abc.abstractmethod
+    def send_batch(self, metrics: List[Dict[str, Any]], encoded: Optional[List[bytes]] = None) -> bool:
+        """Sends metrics; `encoded`, when given, holds encode() of each metric and is sent as is."""
+
+    def send_checked(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> Optional[bool]:
+        """
+        Like send(), but tells a payload that will never be accepted (None)
+        apart from a failure that is worth retrying (False).
+        """
+        body = self.encode(data)
+        if body is None:
+            return None
+        return self.send(body)
+
+    def close(self):
+        pass
+
+    def encode(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> Optional[bytes]:
+        """JSON-encodes a payload as it goes on the wire (bytes pass through); None if it cannot be."""
+        if isinstance(data, bytes):
+            return data
+        with profiler.phase('serialize'):
+            try:
+                return json.dumps(data, allow_nan=False).encode()
+            except ValueError as e:
+                print(f"[Error] Metric payload is not valid JSON: {e}")
+                return None
+
+
+class HTTPTransmitter(Transmitter):
+
+    def __init__(self, server_url: str, endpoint: str, timeout: int, max_retries: int, pool_size: int = 1):
         self.server_url = server_url.rstrip('/')
         self.endpoint = endpoint
         self.timeout = timeout
         self.max_retries = max_retries
         self.full_url = f"{self.server_url}{self.endpoint}"
 
-    def send(self, data: Dict[str, Any]) -> bool:
-        """Sends a single metric payload to the server."""
+        # Keep-alive connections are reused across sends instead of opening
+        # a new TCP connection per metric.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @property
+    def target(self) -> str:
+        return self.full_url
+
+    # Client errors that say nothing about the payload itself and may succeed later.
+    RETRYABLE_CLIENT_ERRORS = (408, 429)
+
+    def send(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> bool:
+        """Sends a single metric payload, or a list of them as one JSON array, to the server."""
+        return self.send_checked(data) is True
+
+    def send_checked(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> Optional[bool]:
+        # Encoded once up front so retries do not serialize the payload again.
+        body = self.encode(data)
+        if body is None:
+            return None
+
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
+                response = self.session.post(
                     self.full_url,
-                    json=data,
+                    data=body,
                     timeout=self.timeout,
                     headers={'Content-Type': 'application/json'}
                 )
@@ -26,6 +100,10 @@ class HTTPTransmitter:
                     return True
                 else:
                     print(f"[Error] Server returned status {response.status_code}: {response.text}")
+                    if (400 <= response.status_code < 500
+                            and response.status_code not in self.RETRYABLE_CLIENT_ERRORS):
+                        # Sending the same payload again gets the same answer.
+                        return None
 
             except requests.exceptions.RequestException as e:
                 print(f"[Error] Connection error on attempt {attempt + 1}/{self.max_retries}: {e}")
@@ -38,14 +116,14 @@ class HTTPTransmitter:
         print(f"[Error] Failed to send metric after {self.max_retries} attempts.")
         return False
 
-    def send_batch(self, metrics: List[Dict[str, Any]]) -> bool:
+    def send_batch(self, metrics: List[Dict[str, Any]], encoded: Optional[List[bytes]] = None) -> bool:
 
         if not metrics:
             return True
 
         print(f"Transmitting a batch of {len(metrics)} metrics...")
         all_successful = True
-        for i, metric in enumerate(metrics):
+        for i, metric in enumerate(encoded if encoded is not None else metrics):
             print(f"Sending metric {i + 1}/{len(metrics)}...")
             if not self.send(metric):
                 all_successful = False
@@ -56,4 +134,168 @@ class HTTPTransmitter:
         else:
             print(f"Finished sending batch with one or more failures.")
 
-        return all_successful
\ No newline at end of file
+        return all_successful
+
+    def close(self):
+        self.session.close()
+
+
+class UnixSocketTransmitter(Transmitter):
+    """
+    Streams metrics to a local forwarder over a persistent Unix domain socket.
+    Each metric is one frame: a 4-byte big-endian length followed by the JSON
+    payload. A batch is written with a single sendall().
+    """
+
+    _FRAME_LENGTH = struct.Struct('!I')
+
+    def __init__(self, socket_path: str, timeout: float, max_retries: int):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.sock: Optional[socket.socket] = None
+        # Relay forwarders share one transmitter; frames must not interleave.
+        self.lock = threading.Lock()
+
+    @property
+    def target(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    def send(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> bool:
+        """Sends one frame; a list is sent as a single JSON array frame."""
+        body = self.encode(data)
+        if body is None:
+            return False
+        return self._write(self._FRAME_LENGTH.pack(len(body)) + body)
+
+    def send_batch(self, metrics: List[Dict[str, Any]], encoded: Optional[List[bytes]] = None) -> bool:
+        if not metrics:
+            return True
+
+        frames = []
+        for metric in encoded if encoded is not None else metrics:
+            body = self.encode(metric)
+            if body is not None:
+                frames.append(self._FRAME_LENGTH.pack(len(body)))
+                frames.append(body)
+
+        if not self._write(b''.join(frames)):
+            return False
+        return len(frames) == 2 * len(metrics)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _write(self, payload: bytes) -> bool:
+        with self.lock:
+            return self._write_locked(payload)
+
+    def _write_locked(self, payload: bytes) -> bool:
+        for attempt in range(self.max_retries):
+            try:
+                if self.sock is None:
+                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self.sock.settimeout(self.timeout)
+                    self.sock.connect(self.socket_path)
+                self.sock.sendall(payload)
+                return True
+            except OSError as e:
+                # A partial write leaves the stream unframed, so always reconnect.
+                print(f"[Error] Socket error on attempt {attempt + 1}/{self.max_retries}: {e}")
+                self.close()
+
+            if attempt < self.max_retries - 1:
+                time.sleep(0.1 * 2 ** attempt)
+
+        print(f"[Error] Failed to write to {self.socket_path} after {self.max_retries} attempts.")
+        return False
+
+
+class UDPTransmitter(Transmitter):
+    """
+    Fire-and-forget UDP datagrams for loss-tolerant, high-rate metrics.
+
+    Every metric is JSON-encoded and split into fragments of at most
+    `max_datagram` bytes, each prefixed with a header:
+    magic (u16), version (u8), reserved (u8), sender id (u32),
+    message id (u32), fragment index (u16), fragment count (u16).
+    Receivers reassemble by (sender id, message id) and drop incomplete
+    messages; nothing is retried.
+    """
+
+    HEADER = struct.Struct('!HBBIIHH')
+    MAGIC = 0x4D54
+    VERSION = 1
+
+    def __init__(self, host: str, port: int, max_datagram: int = 1400):
+        self.address = (host, port)
+        self.max_fragment = max_datagram - self.HEADER.size
+        self.sender_id = random.getrandbits(32)
+        self.message_ids = itertools.count()
+        self.sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_DGRAM)
+
+    @property
+    def target(self) -> str:
+        return f"udp://{self.address[0]}:{self.address[1]}"
+
+    def send(self, data: Dict[str, Any] | List[Dict[str, Any]] | bytes) -> bool:
+        body = self.encode(data)
+        if body is None:
+            return False
+
+        message_id = next(self.message_ids) & 0xFFFFFFFF
+        count = max(1, -(-len(body) // self.max_fragment))
+        if count > 0xFFFF:
+            print(f"[Error] Metric of {len(body)} bytes is too large for UDP transport")
+            return False
+
+        try:
+            for index in range(count):
+                fragment = body[index * self.max_fragment:(index + 1) * self.max_fragment]
+                header = self.HEADER.pack(self.MAGIC, self.VERSION, 0, self.sender_id, message_id, index, count)
+                self.sock.sendto(header + fragment, self.address)
+        except OSError as e:
+            print(f"[Error] UDP send to {self.address} failed: {e}")
+            return False
+        return True
+
+    def send_batch(self, metrics: List[Dict[str, Any]], encoded: Optional[List[bytes]] = None) -> bool:
+        return all([self.send(metric) for metric in (encoded if encoded is not None else metrics)])
+
+    def close(self):
+        self.sock.close()
+
+
+def create_transmitter(server_cfg: Dict[str, Any], pool_size: int = 1) -> Transmitter:
+    """Builds the transport selected by server.transport (http, unix or udp)."""
+    transport = server_cfg.get('transport', 'http')
+
+    match transport:
+        case 'http':
+            return HTTPTransmitter(
+                server_url=server_cfg.get('url'),
+                endpoint=server_cfg.get('endpoint'),
+                timeout=server_cfg.get('timeout'),
+                max_retries=server_cfg.get('max_retries'),
+                pool_size=pool_size
+            )
+        case 'unix':
+            if not server_cfg.get('socket_path'):
+                raise ValueError("socket_path not found in config.yaml under server section (transport: unix)")
+            return UnixSocketTransmitter(
+                socket_path=server_cfg.get('socket_path'),
+                timeout=server_cfg.get('timeout'),
+                max_retries=server_cfg.get('max_retries')
+            )
+        case 'udp':
+            if not server_cfg.get('port'):
+                raise ValueError("port not found in config.yaml under server section (transport: udp)")
+            return UDPTransmitter(
+                host=server_cfg.get('host', '127.0.0.1'),
+                port=server_cfg.get('port'),
+                max_datagram=server_cfg.get('max_datagram', 1400)
+            )
+
+    raise ValueError(f"Unknown transport '{transport}' in config.yaml under server section")
@@ -0,0 +1,174 @@
+"""
+Throughput benchmarks for the metric transports.
+
+Each benchmark sends `count` synthetic metrics through one transport to a
+local sink in the same process and reports metrics/sec, MB/sec and how many
+metrics the sink actually received.
+
+Usage:
+    python -m src.transport_bench http --count 2000
+    python -m src.transport_bench unix --count 20000
+    python -m src.transport_bench udp --count 20000 --max-datagram 8192
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Any, List, Tuple
+
+from src.mock_server import MockIngestServer
+from src.simulator import synthetic_collectors
+from src.transmitter import Transmitter, HTTPTransmitter, UnixSocketTransmitter, UDPTransmitter
+
+
+def _make_metrics(count: int, interfaces: int) -> List[Dict[str, Any]]:
+    collectors, _ = synthetic_collectors(interfaces, partitions=4)
+    return [{'client_id': 'bench', **{name: func() for name, func in collectors.items()}}
+            for _ in range(count)]
+
+
+class _Counter:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = 0
+
+    def add(self, n: int = 1):
+        with self.lock:
+            self.received += n
+
+
+def _http_sink(counter: _Counter, args: argparse.Namespace) -> Tuple[Transmitter, Callable[[], None]]:
+    server = MockIngestServer(on_metric=lambda metric: counter.add())
+    server.start()
+    transmitter = HTTPTransmitter(server.url, server.endpoint, timeout=5, max_retries=1)
+    return transmitter, server.stop
+
+
+def _unix_sink(counter: _Counter, args: argparse.Namespace) -> Tuple[Transmitter, Callable[[], None]]:
+    socket_path = os.path.join(tempfile.mkdtemp(), 'bench.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn, conn.makefile('rb') as stream:
+            while True:
+                header = stream.read(4)
+                if len(header) < 4:
+                    return
+                json.loads(stream.read(struct.unpack('!I', header)[0]))
+                counter.add()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    transmitter = UnixSocketTransmitter(socket_path, timeout=5, max_retries=1)
+
+    def stop():
+        transmitter.close()
+        thread.join(timeout=5)
+        listener.close()
+        os.remove(socket_path)
+
+    return transmitter, stop
+
+
+def _udp_sink(counter: _Counter, args: argparse.Namespace) -> Tuple[Transmitter, Callable[[], None]]:
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(0.5)
+    header = UDPTransmitter.HEADER
+    running = [True]
+
+    def serve():
+        partial: Dict[Tuple[int, int], Dict[int, bytes]] = {}
+        while running[0]:
+            try:
+                datagram = receiver.recv(65535)
+            except socket.timeout:
+                continue
+            _, _, _, sender, message, index, count = header.unpack_from(datagram)
+            fragments = partial.setdefault((sender, message), {})
+            fragments[index] = datagram[header.size:]
+            if len(fragments) == count:
+                del partial[(sender, message)]
+                json.loads(b''.join(fragments[i] for i in range(count)))
+                counter.add()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    transmitter = UDPTransmitter('127.0.0.1', receiver.getsockname()[1], max_datagram=args.max_datagram)
+
+    def stop():
+        running[0] = False
+        thread.join()
+        transmitter.close()
+        receiver.close()
+
+    return transmitter, stop
+
+
+SINKS = {
+    'http': _http_sink,
+    'unix': _unix_sink,
+    'udp': _udp_sink,
+}
+
+
+def run_benchmark(transport: str, args: argparse.Namespace) -> Dict[str, Any]:
+    metrics = _make_metrics(args.count, args.interfaces)
+    payload_bytes = sum(len(json.dumps(metric)) for metric in metrics)
+    counter = _Counter()
+    transmitter, stop = SINKS[transport](counter, args)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for i in range(0, len(metrics), args.batch_size):
+            transmitter.send_batch(metrics[i:i + args.batch_size])
+        elapsed = time.perf_counter() - start
+
+    # Give the sink a moment to drain what is still in flight.
+    deadline = time.monotonic() + 2
+    while counter.received < args.count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop()
+
+    return {
+        'transport': transport,
+        'elapsed': elapsed,
+        'metrics_per_sec': args.count / elapsed,
+        'mb_per_sec': payload_bytes / elapsed / 1024 ** 2,
+        'avg_metric_bytes': payload_bytes / args.count,
+        'received': counter.received
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark metric transport throughput')
+    parser.add_argument('transport', choices=sorted(SINKS) + ['all'])
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--interfaces', type=int, default=4, help='synthetic NICs per metric')
+    parser.add_argument('--max-datagram', type=int, default=1400, help='UDP datagram size')
+    args = parser.parse_args()
+
+    transports = sorted(SINKS) if args.transport == 'all' else [args.transport]
+    for transport in transports:
+        result = run_benchmark(transport, args)
+        print(f"=== {transport} ===")
+        print(f"metrics/sec: {result['metrics_per_sec']:.0f}")
+        print(f"MB/sec: {result['mb_per_sec']:.2f} (avg {result['avg_metric_bytes']:.0f} bytes/metric)")
+        print(f"received: {result['received']}/{args.count}")
+        print(f"Time taken: {result['elapsed']:.4f} seconds\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Time budgets for individual metric collectors."""
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional, Tuple
+
+from src import profiler
+
+
+class BudgetedCollector:
+    """
+    Runs one collector function under a time budget.
+
+    Each call runs in its own daemon thread, so a call that hangs for good
+    never keeps the agent from exiting. A call that overruns its budget keeps
+    running in the background and the last good value is returned marked as
+    stale; a call that raises is logged and handled the same way. Repeated
+    failures first slow the collector down (it only runs every `cadence`
+    ticks) and then disable it; a disabled collector is re-probed every
+    `reprobe_after` ticks and re-enabled once a call fits its budget again.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], budget: float,
+                 degrade_after: int = 3, disable_after: int = 10, max_cadence: int = 8,
+                 reprobe_after: int = 60):
+        self.name = name
+        self.func = func
+        self.budget = budget
+        self.degrade_after = degrade_after
+        self.disable_after = disable_after
+        self.max_cadence = max_cadence
+        self.reprobe_after = reprobe_after
+
+        self.last_value: Any = None
+        self.overruns = 0
+        self.cadence = 1
+        self.skip = 0
+        self.disabled = False
+        self.disabled_reason: Optional[str] = None
+        self._pending: Optional[Future] = None
+
+    def collect(self) -> Tuple[Any, bool]:
+        """Returns (value, stale) for this tick."""
+        self._harvest_pending()
+
+        if self.skip > 0:
+            self.skip -= 1
+            return self.last_value, True
+
+        if self._pending is not None:
+            # Due again while the previous call is still stuck; do not pile up more threads.
+            self._record_timeout()
+            return self.last_value, True
+
+        start = time.perf_counter()
+        future = self._submit()
+        try:
+            value = future.result(timeout=self.budget)
+        except FutureTimeoutError:
+            self._pending = future
+            self._record_timeout()
+            return self.last_value, True
+        except Exception as e:
+            # A failing sensor driver counts like an overrun instead of ending the service.
+            print(f"[Watchdog] {self.name} call failed: {e}")
+            self._record_overrun()
+            return self.last_value, True
+
+        self.last_value = value
+        self.overruns = 0
+        if self.disabled:
+            self.disabled = False
+            self.disabled_reason = None
+            self.cadence = self.max_cadence
+            print(f"[Watchdog] Re-enabling {self.name} ({time.perf_counter() - start:.3f}s), "
+                  f"cadence every {self.cadence} tick(s)")
+        elif self.cadence > 1:
+            self.cadence = max(1, self.cadence // 2)
+            print(f"[Watchdog] {self.name} recovered ({time.perf_counter() - start:.3f}s), "
+                  f"cadence now every {self.cadence} tick(s)")
+        self.skip = self.cadence - 1
+        return value, False
+
+    def _submit(self) -> Future:
+        future: Future = Future()
+        # The worker does the caller's work, so profile it under the caller's phase.
+        phases = profiler.current_phases()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                with profiler.tagged(phases):
+                    future.set_result(self.func())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f'collector-{self.name}', daemon=True).start()
+        return future
+
+    def _harvest_pending(self):
+        """Keeps the result of a call that finished after its budget expired."""
+        if self._pending is None or not self._pending.done():
+            return
+
+        future = self._pending
+        self._pending = None
+        try:
+            self.last_value = future.result()
+        except Exception as e:
+            print(f"[Watchdog] Late {self.name} call failed: {e}")
+
+    def _record_timeout(self):
+        """
+        Counts a budget overrun, except during a profiling run: tracemalloc
+        slows every call down there, and degrading or disabling collectors
+        for that would outlast the run.
+        """
+        if profiler.is_active():
+            self.skip = (self.reprobe_after if self.disabled else self.cadence) - 1
+            return
+        self._record_overrun()
+
+    def _record_overrun(self):
+        """Counts a due call that failed or did not finish in time and schedules the next attempt."""
+        self.overruns += 1
+
+        if self.disabled:
+            print(f"[Watchdog] Re-probe of {self.name} failed, staying disabled")
+            self.skip = self.reprobe_after - 1
+            return
+
+        if self.overruns >= self.disable_after:
+            self.disabled = True
+            self.disabled_reason = (f"failed or exceeded its {self.budget}s budget "
+                                    f"{self.overruns} times in a row")
+            print(f"[Watchdog] Disabling {self.name}: {self.disabled_reason}, "
+                  f"re-probing every {self.reprobe_after} tick(s)")
+            self.skip = self.reprobe_after - 1
+            return
+
+        if self.overruns >= self.degrade_after and self.cadence < self.max_cadence:
+            self.cadence = min(self.cadence * 2, self.max_cadence)
+            print(f"[Watchdog] {self.name} failed or exceeded its {self.budget}s budget "
+                  f"{self.overruns} times, cadence now every {self.cadence} tick(s)")
+
+        self.skip = self.cadence - 1